@@ -0,0 +1,186 @@
+"""
+Admission control: per route class concurrency limits with bounded queues.
+
+Every request is put in a class (public_read, public_write, auth, admin).
+Each class admits up to `concurrency` requests at a time and queues up to
+`queue` more for at most ADMISSION_QUEUE_TIMEOUT_SECONDS; beyond that the
+request is shed with a fast 503, so one busy class can't starve the others
+of threadpool workers and database connections. Limits are per worker.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import asyncio
+import os
+
+from starlette.responses import JSONResponse
+
+from .config import load_env
+
+load_env()
+
+# ======================================================
+# Configuration (env-driven)
+# ======================================================
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(
+    os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5")
+)
+
+# class -> (concurrency, queue); defaults add up to anyio's 40 threads
+DEFAULT_LIMITS = {
+    "public_read": (24, 128),
+    "public_write": (8, 32),
+    "auth": (4, 16),
+    "admin": (4, 8),
+}
+
+# Never queued or shed, so probes keep answering under load
+EXEMPT_PATHS = {"/", "/health", "/health/admission"}
+
+# ======================================================
+# Classification
+# ======================================================
+
+PUBLIC_WRITE_ROUTES = {
+    ("POST", "/feedback"),
+    ("POST", "/contact/send-email"),
+}
+ADMIN_ROUTES = {
+    ("PUT", "/portfolio"),
+    ("GET", "/portfolio/history"),
+    ("GET", "/feedback/pending"),
+    ("GET", "/feedback/all"),
+}
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Return the route class for a request, or None if exempt"""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    if path.startswith("/auth/"):
+        return "auth"
+    if (method, path) in ADMIN_ROUTES:
+        return "admin"
+    if path.startswith("/feedback/") and method in ("PATCH", "DELETE"):
+        return "admin"
+    if (method, path) in PUBLIC_WRITE_ROUTES:
+        return "public_write"
+    return "public_read"
+
+# ======================================================
+# Limiter
+# ======================================================
+
+@dataclass
+class RouteClassLimiter:
+    name: str
+    concurrency: int
+    queue: int
+    active: int = 0
+    queued: int = 0
+    admitted: int = 0
+    shed: int = 0
+    timed_out: int = 0
+    max_queued: int = 0
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+    _loop: Optional[asyncio.AbstractEventLoop] = field(default=None, repr=False)
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created per event loop (a fresh loop per TestClient, for instance)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def acquire(self, timeout: float) -> bool:
+        """Wait for a slot; False means the request should be shed"""
+        semaphore = self.semaphore
+        if not semaphore.locked():
+            await semaphore.acquire()
+        else:
+            if self.queued >= self.queue:
+                self.shed += 1
+                return False
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                self.shed += 1
+                return False
+            finally:
+                self.queued -= 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+def _limit_from_env(name: str, default: int, setting: str) -> int:
+    return int(os.getenv(f"ADMISSION_{name.upper()}_{setting}", str(default)))
+
+limiters: Dict[str, RouteClassLimiter] = {
+    name: RouteClassLimiter(
+        name=name,
+        concurrency=_limit_from_env(name, concurrency, "CONCURRENCY"),
+        queue=_limit_from_env(name, queue, "QUEUE"),
+    )
+    for name, (concurrency, queue) in DEFAULT_LIMITS.items()
+}
+
+def admission_stats() -> dict:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+# ======================================================
+# Middleware
+# ======================================================
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying the per-class limiters"""
+
+    def __init__(self, app, timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS):
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[route_class]
+        if not await limiter.acquire(self.timeout):
+            response = JSONResponse(
+                {"detail": "Server busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -1,20 +1,23 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 import hashlib
 import os
+import secrets
+import uuid
 
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from dotenv import load_dotenv
 
+from .config import load_env
 from .database import get_db
-from .models import User
+from .models import User, RefreshToken
 from .schemas import TokenData
+from .revocation import token_denylist
 
-load_dotenv()
+load_env()
 
 # ======================================================
 # Configuration (env-driven)
@@ -28,14 +31,24 @@ ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 )
+REFRESH_TOKEN_EXPIRE_DAYS = int(
+    os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+)
+
+# Built once so jwt.encode / jwt.decode skip key parsing on every call
+JWT_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
+JWT_ALGORITHMS = [ALGORITHM]
 
 # ======================================================
 # Password hashing (bcrypt-safe)
 # ======================================================
 
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS
 )
 
 def _pre_hash_password(password: str) -> str:
@@ -61,6 +74,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 # ======================================================
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="auth/login",
+    auto_error=False
+)
 
 def authenticate_user(
     db: Session,
@@ -92,8 +109,114 @@ def create_access_token(
         else timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, JWT_KEY, algorithm=ALGORITHM)
+
+def revoke_token(token: str) -> bool:
+    """Add a token's jti to the denylist until it expires"""
+    try:
+        payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
+    except JWTError:
+        return False
+
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if not jti or not exp:
+        return False
+
+    token_denylist.revoke(jti, float(exp))
+    return True
+
+# ======================================================
+# Refresh tokens (opaque, stored hashed, rotated on use)
+# ======================================================
+
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def create_refresh_token(
+    db: Session,
+    user: User,
+    family_id: Optional[str] = None
+) -> str:
+    """Create a refresh token; rotations of one login share a family"""
+    token = secrets.token_urlsafe(48)
+    db.add(RefreshToken(
+        user_id=user.id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    return token
+
+def _revoke_refresh_family(db: Session, family_id: str) -> None:
+    db.query(RefreshToken)\
+        .filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None)
+        )\
+        .update(
+            {RefreshToken.revoked_at: datetime.now(timezone.utc)},
+            synchronize_session=False
+        )
+    db.commit()
+
+def rotate_refresh_token(
+    db: Session,
+    token: str
+) -> Optional[Tuple[User, str]]:
+    """
+    Exchange a refresh token for a new one (single hashed lookup, no bcrypt).
+    Presenting an already-rotated token revokes its whole family.
+    """
+    record = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.token_hash == _hash_refresh_token(token))
+        .first()
+    )
+    if record is None:
+        return None
+
+    if record.used_at is not None or record.revoked_at is not None:
+        # Reuse of a rotated token: assume it leaked and end the session
+        _revoke_refresh_family(db, record.family_id)
+        return None
+
+    expires_at = record.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if expires_at <= datetime.now(timezone.utc):
+        return None
+
+    # Conditional update so two concurrent refreshes can't both win
+    claimed = db.query(RefreshToken)\
+        .filter(RefreshToken.id == record.id, RefreshToken.used_at.is_(None))\
+        .update(
+            {RefreshToken.used_at: datetime.now(timezone.utc)},
+            synchronize_session=False
+        )
+    db.commit()
+    if not claimed:
+        _revoke_refresh_family(db, record.family_id)
+        return None
+
+    user = db.query(User).filter(User.id == record.user_id).first()
+    if user is None or not user.is_active:
+        return None
+
+    return user, create_refresh_token(db, user, family_id=record.family_id)
+
+def revoke_refresh_token(db: Session, token: str) -> None:
+    """Revoke the session a refresh token belongs to"""
+    record = (
+        db.query(RefreshToken.family_id)
+        .filter(RefreshToken.token_hash == _hash_refresh_token(token))
+        .first()
+    )
+    if record is not None:
+        _revoke_refresh_family(db, record.family_id)
 
 # ======================================================
 # Dependencies
@@ -111,10 +234,12 @@ async def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, JWT_KEY, algorithms=JWT_ALGORITHMS)
         username: str | None = payload.get("sub")
         if username is None:
             raise credentials_exception
+        if token_denylist.is_revoked(payload.get("jti")):
+            raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
@@ -0,0 +1,67 @@
+"""
+Measure per-route latency in-process, no external database needed.
+
+    APP_ENV=test python -m app.bench_api [iterations]
+
+Runs the app on in-memory SQLite through Starlette's TestClient (needs
+httpx), restoring the seeded database before each route so every route
+starts from the same data.
+"""
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from .main import app
+from .testing import seed_database
+
+
+def _bench(client, iterations: int, request) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        response = request(client)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{response.status_code}: {response.text}")
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with TestClient(app) as client:
+        db_snapshot = seed_database()
+
+        token = client.post(
+            "/auth/login", data={"username": "admin", "password": "admin"}
+        ).json()["access_token"]
+        auth = {"Authorization": f"Bearer {token}"}
+
+        routes = {
+            "GET /portfolio": lambda c: c.get("/portfolio"),
+            "GET /feedback/approved": lambda c: c.get("/feedback/approved"),
+            "GET /auth/me": lambda c: c.get("/auth/me", headers=auth),
+            "GET /feedback/all": lambda c: c.get("/feedback/all", headers=auth),
+            "POST /feedback": lambda c: c.post(
+                "/feedback", json={"name": "Bench", "message": "Hello"}
+            ),
+            "POST /feedback (replayed key)": lambda c: c.post(
+                "/feedback",
+                json={"name": "Bench", "message": "Hello"},
+                headers={"Idempotency-Key": "bench"}
+            ),
+            "POST /feedback (new key)": lambda c: c.post(
+                "/feedback",
+                json={"name": "Bench", "message": "Hello"},
+                headers={"Idempotency-Key": uuid.uuid4().hex}
+            ),
+        }
+
+        for name, request in routes.items():
+            db_snapshot.restore()
+            ms = _bench(client, iterations, request)
+            print(f"{name:32s} {ms:8.3f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
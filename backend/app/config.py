@@ -0,0 +1,28 @@
+"""
+Environment loading shared by every module that reads settings.
+
+Each of them calls load_env() before its own os.getenv() calls, so the
+order in which modules are imported does not matter. With APP_ENV=test
+hermetic defaults are filled in first; real environment variables (and
+.env) still win.
+"""
+import os
+import secrets
+
+from dotenv import load_dotenv
+
+def is_test_env() -> bool:
+    return os.getenv("APP_ENV", "production") == "test"
+
+def load_env() -> None:
+    """Load .env and, in test mode, the hermetic defaults"""
+    if is_test_env():
+        # Embedded database, throwaway secret, cheap hashing,
+        # no background jobs, process-local revocations
+        os.environ.setdefault("DATABASE_URL", "sqlite://")
+        os.environ.setdefault("SECRET_KEY", secrets.token_hex(32))
+        os.environ.setdefault("ADMIN_PASSWORD", "admin")
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        os.environ.setdefault("RETENTION_INTERVAL_HOURS", "0")
+        os.environ.setdefault("TOKEN_DENYLIST_BACKEND", "memory")
+    load_dotenv()
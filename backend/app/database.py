@@ -1,14 +1,60 @@
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from typing import Callable, TypeVar
+import itertools
 import os
-from dotenv import load_dotenv
+import time
 
-load_dotenv()
+from .config import load_env
+
+load_env()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL not set (or use APP_ENV=test)")
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _create_sqlite_engine(url: str):
+    """
+    SQLite for tests, benchmarks and local runs.
+    In-memory databases use a single shared connection (StaticPool) so
+    every session and thread sees the same data.
+    """
+    memory = _is_memory_sqlite(url)
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if memory:
+        kwargs["poolclass"] = StaticPool
+
+    sqlite_engine = create_engine(url, **kwargs)
 
-engine = create_engine(DATABASE_URL)
+    @event.listens_for(sqlite_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if memory:
+            cursor.execute("PRAGMA journal_mode=MEMORY")
+            cursor.execute("PRAGMA synchronous=OFF")
+        else:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-16000")
+        cursor.close()
+
+    return sqlite_engine
+
+def _create_engine(url: str, **kwargs):
+    if url.startswith("sqlite"):
+        return _create_sqlite_engine(url)
+    return create_engine(url, **kwargs)
+
+engine = _create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,4 +65,136 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# ======================================================
+# Read replicas (optional)
+# ======================================================
+
+DATABASE_READ_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_READ_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+PRIMARY_READS_COOKIE = "read_primary"
+
+class Replica:
+    """A read-only database, taken out of rotation for a while on errors"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = _create_engine(url, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine
+        )
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, error: Exception) -> None:
+        if self.healthy:
+            print(f"⚠️  Read replica {self.name} unavailable, using primary: {error}")
+        self.down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+
+replicas = [
+    Replica(f"replica{i}", url) for i, url in enumerate(DATABASE_READ_URLS)
+]
+_replica_counter = itertools.count()
+
+def _open_replica_session():
+    """Session on the next healthy replica (round robin), or None"""
+    for _ in range(len(replicas)):
+        replica = replicas[next(_replica_counter) % len(replicas)]
+        if not replica.healthy:
+            continue
+        db = replica.SessionLocal()
+        try:
+            # Check out (and pre-ping) the connection now so a dead
+            # replica falls back to the primary instead of failing the request
+            db.connection()
+        except DBAPIError as e:
+            db.close()
+            replica.mark_down(e)
+            continue
+        db.info["replica"] = replica.name
+        return db, replica
+    return None
+
+def _wants_primary(request: Request) -> bool:
+    # Authenticated (admin) sessions and clients that just wrote
+    # read from the primary, so they always see their own changes
+    return (
+        "authorization" in request.headers
+        or PRIMARY_READS_COOKIE in request.cookies
+    )
+
+def get_read_db(request: Request):
+    """
+    Dependency for safe GET handlers: a replica session when replicas
+    are configured and healthy, the primary otherwise.
+
+    A replica that dies after checkout only fails the request if the
+    handler does not wrap its queries in read_with_fallback(); either
+    way the replica is marked down and later requests use the primary.
+    """
+    opened = None
+    if replicas and not _wants_primary(request):
+        opened = _open_replica_session()
+
+    if opened is None:
+        yield from get_db()
+        return
+
+    db, replica = opened
+    try:
+        yield db
+    except DBAPIError as e:
+        if e.connection_invalidated:
+            replica.mark_down(e)
+        raise
+    finally:
+        db.close()
+
+T = TypeVar("T")
+
+def read_with_fallback(db: Session, read: Callable[[Session], T]) -> T:
+    """
+    Run `read(db)`; if db is a replica session whose connection drops,
+    mark the replica down and run it again on the primary.
+    """
+    name = db.info.get("replica")
+    if name is None:
+        return read(db)
+
+    try:
+        return read(db)
+    except DBAPIError as e:
+        if not e.connection_invalidated:
+            raise
+        db.rollback()
+        for replica in replicas:
+            if replica.name == name:
+                replica.mark_down(e)
+
+    primary = SessionLocal()
+    try:
+        return read(primary)
+    finally:
+        primary.close()
+
+def mark_primary_reads(response: Response) -> None:
+    """After a write, pin this client's reads to the primary for a while"""
+    if not replicas:
+        return
+    response.set_cookie(
+        key=PRIMARY_READS_COOKIE,
+        value="1",
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax",
+        secure=False
+    )
@@ -0,0 +1,311 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+
+from .config import load_env
+from .database import SessionLocal
+from .models import IdempotencyKey
+from .singleflight import SingleFlight
+
+load_env()
+
+# ======================================================
+# Configuration (env-driven)
+# ======================================================
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))
+# An in-progress claim older than this is treated as abandoned (the worker
+# died mid-request) and the next retry takes it over
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# ======================================================
+# Store
+# ======================================================
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: Any
+    expires_at: float
+
+def _request_hash(payload: dict) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class IdempotencyStore:
+    """
+    Remembers the response of requests sent with an Idempotency-Key.
+
+    Lookups hit a bounded in-process LRU first and the idempotency_keys
+    table second. Duplicates arriving while the original is still running
+    wait for it in the same process; on another worker they get a 409
+    until the claim's lease runs out.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        lease_seconds: float = IDEMPOTENCY_LEASE_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._entries: "OrderedDict[Tuple[str, str], StoredResponse]" = OrderedDict()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        scope: str,
+        key: str,
+        payload: dict,
+        status_code: int,
+        handler: Callable[[], Any]
+    ) -> Tuple[StoredResponse, bool]:
+        """
+        Execute `handler` once per (scope, key).
+        Returns the stored response and whether it was replayed.
+        """
+        request_hash = _request_hash(payload)
+        cache_key = (scope, key)
+
+        stored = self._get_cached(cache_key)
+        replayed = stored is not None
+
+        if stored is None:
+            def execute():
+                result = self._execute(
+                    cache_key, request_hash, status_code, handler
+                )
+                self._cache(cache_key, result[0])
+                return result
+
+            (stored, replayed), shared = self._flight.do(cache_key, execute)
+            replayed = replayed or shared
+
+        if stored.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request"
+            )
+
+        return stored, replayed
+
+    def _execute(self, cache_key, request_hash, status_code, handler):
+        stored = self._claim_or_load(cache_key, request_hash)
+        if stored is not None:
+            return stored, True
+
+        try:
+            body = handler()
+        except BaseException:
+            self._release(cache_key)
+            raise
+
+        stored = StoredResponse(
+            request_hash, status_code, body, time.time() + self.ttl_seconds
+        )
+        try:
+            self._complete(cache_key, stored)
+        except Exception as e:
+            # The handler's side effects already happened: still answer
+            # (and cache) its response so a retry here replays it
+            print(f"Failed to store idempotent response for {cache_key}: {e}")
+        return stored, False
+
+    # --------------------------------------------------
+    # In-memory LRU
+    # --------------------------------------------------
+
+    def _get_cached(self, cache_key) -> Optional[StoredResponse]:
+        with self._lock:
+            stored = self._entries.get(cache_key)
+            if stored is None:
+                return None
+            if stored.expires_at <= time.time():
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return stored
+
+    def _cache(self, cache_key, stored: StoredResponse) -> None:
+        with self._lock:
+            self._entries[cache_key] = stored
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # --------------------------------------------------
+    # Durable table
+    # --------------------------------------------------
+
+    def _claim_or_load(self, cache_key, request_hash) -> Optional[StoredResponse]:
+        """
+        Return the completed response for this key, or claim it for this
+        request (returns None): insert an in-progress row, or take over
+        one whose lease has expired. created_at is the time of the claim.
+        """
+        scope, key = cache_key
+        in_progress = HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is already in progress"
+        )
+        now = datetime.now(timezone.utc)
+
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+                .first()
+            )
+            if row is not None and _as_utc(row.expires_at) <= now:
+                db.delete(row)
+                db.commit()
+                row = None
+
+            if row is None:
+                db.add(IdempotencyKey(
+                    scope=scope,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                ))
+                db.commit()
+                return None
+
+            if row.response_body is not None:
+                return StoredResponse(
+                    row.request_hash,
+                    row.status_code,
+                    json.loads(row.response_body),
+                    _as_utc(row.expires_at).timestamp(),
+                )
+
+            lease_start = now - timedelta(seconds=self.lease_seconds)
+            if row.request_hash != request_hash or _as_utc(row.created_at) > lease_start:
+                raise in_progress
+
+            # Conditional update: only one retry wins an abandoned claim
+            taken = db.query(IdempotencyKey)\
+                .filter(
+                    IdempotencyKey.id == row.id,
+                    IdempotencyKey.response_body.is_(None),
+                    IdempotencyKey.created_at <= lease_start
+                )\
+                .update(
+                    {
+                        IdempotencyKey.created_at: now,
+                        IdempotencyKey.expires_at: now
+                        + timedelta(seconds=self.ttl_seconds),
+                    },
+                    synchronize_session=False
+                )
+            db.commit()
+            if not taken:
+                raise in_progress
+            print(f"⚠️  Took over abandoned idempotency claim {scope}/{key}")
+            return None
+        except IntegrityError:
+            db.rollback()
+            raise in_progress
+        finally:
+            db.close()
+
+    def _complete(self, cache_key, stored: StoredResponse) -> None:
+        scope, key = cache_key
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey)\
+                .filter(IdempotencyKey.scope == scope, IdempotencyKey.key == key)\
+                .update(
+                    {
+                        IdempotencyKey.status_code: stored.status_code,
+                        IdempotencyKey.response_body: json.dumps(stored.body),
+                    },
+                    synchronize_session=False
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _release(self, cache_key) -> None:
+        """Drop the in-progress claim so the client can retry a failed request"""
+        scope, key = cache_key
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey)\
+                .filter(
+                    IdempotencyKey.scope == scope,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.response_body.is_(None)
+                )\
+                .delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+        finally:
+            db.close()
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+idempotency_store = IdempotencyStore(
+    max_entries=IDEMPOTENCY_CACHE_SIZE,
+    ttl_seconds=IDEMPOTENCY_TTL_HOURS * 3600,
+)
+
+# ======================================================
+# Route helper
+# ======================================================
+
+def run_idempotent(
+    scope: str,
+    idempotency_key: Optional[str],
+    payload: dict,
+    response: Response,
+    handler: Callable[[], Any],
+    status_code: int = status.HTTP_200_OK
+) -> Any:
+    """
+    Run a route body at most once per Idempotency-Key.
+    `handler` must return a JSON-serializable body.
+    Without a key the handler simply runs.
+    """
+    if not idempotency_key:
+        return handler()
+
+    if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key is too long"
+        )
+
+    stored, replayed = idempotency_store.run(
+        scope, idempotency_key, payload, status_code, handler
+    )
+    response.status_code = stored.status_code
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return stored.body
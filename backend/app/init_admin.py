@@ -1,18 +1,52 @@
+from contextlib import contextmanager
 import os
-from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
+from .config import load_env
 from .database import SessionLocal, engine
 from .models import Base, User
 from .auth import get_password_hash
 
-load_dotenv()
+load_env()
+
+# Arbitrary constant shared by every worker of this app
+INIT_LOCK_KEY = 727_001
+INITIALIZED_ENV = "PORTFOLIO_DB_INITIALIZED"
+
+@contextmanager
+def _init_lock():
+    """
+    Serialize first-boot initialization across processes.
+    Uses a Postgres advisory lock; other databases run unlocked.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": INIT_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": INIT_LOCK_KEY})
 
 def init_admin():
     """
-    Create admin user on startup if it does not exist.
+    Create tables and the admin user on startup if they do not exist.
+    Safe to call from every worker: runs at most once per process tree
+    (the flag is inherited by forked workers) and under a lock otherwise.
     """
-    Base.metadata.create_all(bind=engine)
+    if os.getenv(INITIALIZED_ENV) == "1":
+        return
+
+    with _init_lock():
+        Base.metadata.create_all(bind=engine)
+        _create_admin_user()
 
+    os.environ[INITIALIZED_ENV] = "1"
+
+def _create_admin_user():
     db = SessionLocal()
     try:
         admin_username = os.getenv("ADMIN_USERNAME", "admin")
@@ -45,6 +79,10 @@ def init_admin():
 
         print("✅ Admin user created")
 
+    except IntegrityError:
+        # Another process created it between our check and insert
+        db.rollback()
+        print(f"✓ Admin '{admin_username}' already exists")
     except Exception:
         db.rollback()
         raise
@@ -1,25 +1,41 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Response
+from fastapi import FastAPI, BackgroundTasks, Depends, Header, HTTPException, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 import json
 
-from .database import get_db, engine
-from .models import Base, User, Portfolio, PortfolioHistory, Feedback
+from .database import (
+    SessionLocal, get_db, get_read_db, mark_primary_reads, read_with_fallback
+)
+from .models import User, Portfolio, PortfolioHistory, Feedback
 from .schemas import (
     ContactEmailRequest, UserCreate, User as UserSchema, Token, UserLogin,
+    RefreshRequest,
     PortfolioData, PortfolioResponse, PortfolioUpdate,
     PortfolioHistoryResponse,
     FeedbackCreate, FeedbackResponse, FeedbackApprove,
 )
 from .auth import (
     authenticate_user, create_access_token, get_password_hash,
-    get_current_active_user, get_current_admin_user,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    get_current_active_user, get_current_admin_user, revoke_token,
+    optional_oauth2_scheme, create_refresh_token, rotate_refresh_token,
+    revoke_refresh_token, ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS
 )
 from .init_admin import init_admin
+from .idempotency import run_idempotent
+from .singleflight import read_flight
+from .revocation import token_denylist
+from .retention import start_retention_scheduler
+from .admission import AdmissionControlMiddleware, admission_stats
+from .snapshots import (
+    SNAPSHOT_DIR, portfolio_payload, approved_feedback_payload,
+    publish_in_background
+)
 
 app = FastAPI(
     title="Portfolio API",
@@ -32,10 +48,14 @@ app = FastAPI(
 async def startup_event():
     """Run on application startup"""
     print("🚀 Starting up Portfolio API...")
-    Base.metadata.create_all(bind=engine)
     init_admin()
+    token_denylist.start()
+    start_retention_scheduler()
     print("✅ Portfolio API ready!")
 
+# Admission control (added before CORS so shed responses get CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -87,21 +107,17 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return new_user
 
-@app.post("/auth/login", response_model=Token)
-def login(
+def _issue_tokens(
     response: Response,
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
-):
-    """Login and receive access token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
+    user: User,
+    refresh_token: str,
+    include_refresh_token: bool = False
+) -> dict:
+    """
+    Create an access token and set both auth cookies.
+    The refresh token stays in its httponly cookie unless a non-browser
+    client asks for it in the body.
+    """
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
@@ -116,13 +132,86 @@ def login(
         samesite="lax",
         secure=False
     )
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        expires=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        path="/auth",
+        samesite="lax",
+        secure=False
+    )
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token if include_refresh_token else None
+    }
+
+@app.post("/auth/login", response_model=Token)
+def login(
+    response: Response,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    include_refresh_token: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Login and receive access and refresh tokens"""
+    user = authenticate_user(db, form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return _issue_tokens(
+        response, user, create_refresh_token(db, user), include_refresh_token
+    )
+
+@app.post("/auth/refresh", response_model=Token)
+def refresh(
+    request: Request,
+    response: Response,
+    body: Optional[RefreshRequest] = None,
+    include_refresh_token: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Rotate a refresh token and receive a new access token"""
+    token = (body.refresh_token if body else None) \
+        or request.cookies.get("refresh_token")
+    rotated = rotate_refresh_token(db, token) if token else None
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    user, refresh_token = rotated
+    return _issue_tokens(response, user, refresh_token, include_refresh_token)
 
 @app.post("/auth/logout")
-def logout(response: Response):
-    """Logout and clear cookie"""
+def logout(
+    request: Request,
+    response: Response,
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Logout, revoke the current tokens and clear cookies"""
+    if not token:
+        cookie = request.cookies.get("access_token", "")
+        if cookie.startswith("Bearer "):
+            token = cookie[len("Bearer "):]
+    if token:
+        revoke_token(token)
+
+    refresh_token = request.cookies.get("refresh_token")
+    if refresh_token:
+        revoke_refresh_token(db, refresh_token)
+
     response.delete_cookie(key="access_token")
+    response.delete_cookie(key="refresh_token", path="/auth")
     return {"message": "Successfully logged out"}
 
 @app.get("/auth/me", response_model=UserSchema)
@@ -135,9 +224,25 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
 # ============================================================================
 
 @app.get("/portfolio", response_model=PortfolioResponse)
-def get_portfolio(language: str = "en", db: Session = Depends(get_db)):
+def get_portfolio(language: str = "en", db: Session = Depends(get_read_db)):
+    """Get portfolio data (public); concurrent requests share one query"""
+    result, _ = read_flight.do(
+        ("portfolio", language, db.info.get("replica")),
+        lambda: read_with_fallback(db, lambda s: _load_portfolio(s, language))
+    )
+    return result
+
+def _load_portfolio(db: Session, language: str) -> dict:
     portfolio = db.query(Portfolio).filter(Portfolio.language == language).first()
     
+    if not portfolio and db.info.get("replica"):
+        # Creating the default is a write: do it on the primary
+        primary = SessionLocal()
+        try:
+            return _load_portfolio(primary, language)
+        finally:
+            primary.close()
+    
     if not portfolio:
         default_data = {
             "name": "Your Name",
@@ -176,27 +281,21 @@ def get_portfolio(language: str = "en", db: Session = Depends(get_db)):
         
         portfolio = Portfolio(name="default", language=language, data=json.dumps(default_data))
         db.add(portfolio)
-        db.commit()
-        db.refresh(portfolio)
+        try:
+            db.commit()
+            db.refresh(portfolio)
+        except IntegrityError:
+            # Another worker created the default first; use its row
+            db.rollback()
+            portfolio = db.query(Portfolio).filter(Portfolio.language == language).one()
     
-    # Get the dictionary from the JSON field
-    data_content = portfolio.get_data()
-    
-    # IMPORTANT: If your DB record is old, it might still lack 'email'.
-    # This line ensures the 'email' key exists before it hits the validator.
-    if "email" not in data_content.get("contact", {}):
-        data_content["contact"]["email"] = "your@email.com"
-
-    return {
-        "id": portfolio.id,
-        "name": portfolio.name,
-        "data": data_content,
-        "updated_at": portfolio.updated_at
-    }
+    return portfolio_payload(portfolio)
 
 @app.put("/portfolio", response_model=PortfolioResponse)
 def update_portfolio(
     portfolio_update: PortfolioUpdate,
+    response: Response,
+    background_tasks: BackgroundTasks,
     language: str = "en",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -224,6 +323,12 @@ def update_portfolio(
     
     db.commit()
     db.refresh(portfolio)
+    mark_primary_reads(response)
+    
+    if SNAPSHOT_DIR:
+        background_tasks.add_task(
+            publish_in_background, languages=[language], feedback=False
+        )
     
     return {
         "id": portfolio.id,
@@ -263,28 +368,39 @@ def get_portfolio_history(
 # ============================================================================
 
 @app.post("/feedback", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
-def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
+def create_feedback(
+    feedback: FeedbackCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db)
+):
     """Submit feedback (public endpoint - no auth required)"""
-    new_feedback = Feedback(
-        name=feedback.name,
-        email=feedback.email,
-        message=feedback.message,
-        rating=feedback.rating,
-        is_approved=False
+    def handler():
+        new_feedback = Feedback(
+            name=feedback.name,
+            email=feedback.email,
+            message=feedback.message,
+            rating=feedback.rating,
+            is_approved=False
+        )
+        db.add(new_feedback)
+        db.commit()
+        db.refresh(new_feedback)
+        return jsonable_encoder(FeedbackResponse.model_validate(new_feedback))
+
+    return run_idempotent(
+        "feedback", idempotency_key, feedback.model_dump(), response, handler,
+        status_code=status.HTTP_201_CREATED
     )
-    db.add(new_feedback)
-    db.commit()
-    db.refresh(new_feedback)
-    return new_feedback
 
 @app.get("/feedback/approved", response_model=List[FeedbackResponse])
-def get_approved_feedback(db: Session = Depends(get_db)):
+def get_approved_feedback(db: Session = Depends(get_read_db)):
     """Get all approved feedback (public endpoint)"""
-    feedback_list = db.query(Feedback)\
-        .filter(Feedback.is_approved == True)\
-        .order_by(Feedback.created_at.desc())\
-        .all()
-    return feedback_list
+    result, _ = read_flight.do(
+        ("feedback_approved", db.info.get("replica")),
+        lambda: read_with_fallback(db, approved_feedback_payload)
+    )
+    return result
 
 @app.get("/feedback/pending", response_model=List[FeedbackResponse])
 def get_pending_feedback(
@@ -313,6 +429,8 @@ def get_all_feedback(
 def approve_feedback(
     feedback_id: int,
     approval: FeedbackApprove,
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
@@ -336,11 +454,17 @@ def approve_feedback(
     
     db.commit()
     db.refresh(feedback)
+    mark_primary_reads(response)
+    
+    if SNAPSHOT_DIR:
+        background_tasks.add_task(publish_in_background, languages=[])
     return feedback
 
 @app.delete("/feedback/{feedback_id}")
 def delete_feedback(
     feedback_id: int,
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
 ):
@@ -352,8 +476,13 @@ def delete_feedback(
             detail="Feedback not found"
         )
     
+    was_approved = feedback.is_approved
     db.delete(feedback)
     db.commit()
+    mark_primary_reads(response)
+    
+    if SNAPSHOT_DIR and was_approved:
+        background_tasks.add_task(publish_in_background, languages=[])
     return {"message": "Feedback deleted successfully"}
 
 # ============================================================================
@@ -377,11 +506,25 @@ def health_check():
         "database": "connected"
     }
 
+@app.get("/health/admission")
+def admission_metrics():
+    """Admission control counters per route class (this worker)"""
+    return admission_stats()
+
 @app.post("/contact/send-email")
-async def send_contact_email(
+def send_contact_email(
     contact_request: ContactEmailRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
+    """Send a contact email (retries with the same Idempotency-Key send once)"""
+    return run_idempotent(
+        "contact", idempotency_key, contact_request.model_dump(), response,
+        lambda: _send_contact_email(contact_request, db)
+    )
+
+def _send_contact_email(contact_request: ContactEmailRequest, db: Session) -> dict:
     import resend
     import os
 
@@ -470,4 +613,14 @@ if __name__ == "__main__":
     import os
     
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    if workers > 1:
+        # Create tables/admin once here so workers don't race on first boot
+        init_admin()
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_TIMEOUT", 30))
+    )
\ No newline at end of file
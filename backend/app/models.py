@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, UniqueConstraint
 from sqlalchemy.sql import func
 from .database import Base
 import json
@@ -20,7 +20,7 @@ class Portfolio(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
-    language = Column(String(10), default="en", nullable=False)
+    language = Column(String(10), default="en", nullable=False, unique=True, index=True)
     data = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -53,4 +53,45 @@ class Feedback(Base):
     is_approved = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     approved_at = Column(DateTime(timezone=True), nullable=True)
-    approved_by = Column(Integer, nullable=True)
\ No newline at end of file
+    approved_by = Column(Integer, nullable=True)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(100), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)  # NULL while in progress
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # claim time (lease start)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    
+    name = Column(String(50), primary_key=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
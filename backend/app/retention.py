@@ -0,0 +1,298 @@
+"""
+Retention policies for tables that otherwise grow without bound.
+
+    python -m app.retention        # run once (cron-friendly)
+
+The same job runs in the background of the API when
+RETENTION_INTERVAL_HOURS > 0, at most once per interval across all
+workers and restarts (the last run is recorded in job_runs).
+
+Rows are deleted in bounded batches, each in its own short transaction,
+optionally archived first to gzipped NDJSON files under
+RETENTION_ARCHIVE_DIR.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import gzip
+import json
+import os
+import random
+import threading
+import time
+
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+
+from .config import load_env
+from .database import SessionLocal, engine
+from .models import (
+    PortfolioHistory, Feedback, IdempotencyKey, RevokedToken, RefreshToken,
+    JobRun
+)
+
+load_env()
+
+# ======================================================
+# Configuration (env-driven, 0 disables a policy)
+# ======================================================
+
+HISTORY_KEEP_VERSIONS = int(os.getenv("HISTORY_KEEP_VERSIONS", "50"))
+FEEDBACK_UNAPPROVED_MAX_AGE_DAYS = int(
+    os.getenv("FEEDBACK_UNAPPROVED_MAX_AGE_DAYS", "180")
+)
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+RETENTION_BATCH_PAUSE_SECONDS = float(
+    os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0.1")
+)
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "")
+RETENTION_INTERVAL_HOURS = float(os.getenv("RETENTION_INTERVAL_HOURS", "24"))
+# Workers boot (and are recycled) together; each waits a random delay up
+# to this long before its first check
+RETENTION_STARTUP_JITTER_SECONDS = float(
+    os.getenv("RETENTION_STARTUP_JITTER_SECONDS", "300")
+)
+# How often a worker checks whether the job is due
+RETENTION_CHECK_SECONDS = 3600
+RETENTION_JOB_NAME = "retention"
+
+# Arbitrary constant shared by every worker of this app
+RETENTION_LOCK_KEY = 727_002
+
+# ======================================================
+# Archive
+# ======================================================
+
+class NdjsonArchive:
+    """Append-only gzipped NDJSON file, one per table per run"""
+
+    def __init__(self, directory: str, table: str):
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.path = os.path.join(directory, f"{table}-{stamp}.ndjson.gz")
+        self._file = None
+
+    def write(self, rows) -> None:
+        """Write rows and sync them to disk (call before deleting them)"""
+        if self._file is None:
+            self._file = gzip.open(self.path, "at", encoding="utf-8")
+        for row in rows:
+            record = {c.name: getattr(row, c.name) for c in row.__table__.columns}
+            self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# ======================================================
+# Batched deletion
+# ======================================================
+
+def _delete_in_batches(model, criteria, archive: Optional[NdjsonArchive] = None) -> int:
+    deleted = 0
+    while True:
+        db = SessionLocal()
+        try:
+            query = db.query(model).filter(*criteria).order_by(model.id)
+            if archive is not None:
+                rows = query.limit(RETENTION_BATCH_SIZE).all()
+                ids = [row.id for row in rows]
+                if ids:
+                    archive.write(rows)
+            else:
+                ids = [
+                    row_id for (row_id,) in
+                    query.with_entities(model.id).limit(RETENTION_BATCH_SIZE).all()
+                ]
+            if not ids:
+                break
+
+            db.query(model)\
+                .filter(model.id.in_(ids))\
+                .delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        deleted += len(ids)
+        if len(ids) < RETENTION_BATCH_SIZE:
+            break
+        time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+    return deleted
+
+def _archive_for(table: str) -> Optional[NdjsonArchive]:
+    if not RETENTION_ARCHIVE_DIR:
+        return None
+    return NdjsonArchive(RETENTION_ARCHIVE_DIR, table)
+
+# ======================================================
+# Policies
+# ======================================================
+
+def prune_portfolio_history(keep: int = HISTORY_KEEP_VERSIONS) -> int:
+    """Keep only the `keep` newest history versions of each portfolio"""
+    if keep <= 0:
+        return 0
+
+    db = SessionLocal()
+    try:
+        cutoffs = []
+        portfolio_ids = [
+            pid for (pid,) in db.query(PortfolioHistory.portfolio_id).distinct()
+        ]
+        for pid in portfolio_ids:
+            cutoff = (
+                db.query(PortfolioHistory.id)
+                .filter(PortfolioHistory.portfolio_id == pid)
+                .order_by(PortfolioHistory.id.desc())
+                .offset(keep - 1)
+                .limit(1)
+                .scalar()
+            )
+            if cutoff is not None:
+                cutoffs.append((pid, cutoff))
+    finally:
+        db.close()
+
+    archive = _archive_for(PortfolioHistory.__tablename__)
+    try:
+        return sum(
+            _delete_in_batches(
+                PortfolioHistory,
+                (PortfolioHistory.portfolio_id == pid, PortfolioHistory.id < cutoff),
+                archive,
+            )
+            for pid, cutoff in cutoffs
+        )
+    finally:
+        if archive is not None:
+            archive.close()
+
+def expire_unapproved_feedback(max_age_days: int = FEEDBACK_UNAPPROVED_MAX_AGE_DAYS) -> int:
+    """Delete feedback left unapproved (pending or rejected) for too long"""
+    if max_age_days <= 0:
+        return 0
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    archive = _archive_for(Feedback.__tablename__)
+    try:
+        return _delete_in_batches(
+            Feedback,
+            (Feedback.is_approved == False, Feedback.created_at < cutoff),
+            archive,
+        )
+    finally:
+        if archive is not None:
+            archive.close()
+
+def purge_expired_tokens() -> int:
+    """Delete expired idempotency keys, revocations and refresh tokens"""
+    now = datetime.now(timezone.utc)
+    return (
+        _delete_in_batches(IdempotencyKey, (IdempotencyKey.expires_at < now,))
+        + _delete_in_batches(RevokedToken, (RevokedToken.expires_at < now,))
+        + _delete_in_batches(RefreshToken, (RefreshToken.expires_at < now,))
+    )
+
+# ======================================================
+# Job
+# ======================================================
+
+@contextmanager
+def _try_retention_lock():
+    """Yield True if this process should run the job (one worker at a time)"""
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    with engine.connect() as conn:
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": RETENTION_LOCK_KEY}
+        ).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": RETENTION_LOCK_KEY}
+                )
+
+def _claim_run(min_interval_hours: float) -> bool:
+    """
+    Record a run in job_runs unless one started less than
+    `min_interval_hours` ago (in any process). The conditional update
+    lets only one caller win, with or without an advisory lock.
+    """
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        if db.get(JobRun, RETENTION_JOB_NAME) is None:
+            db.add(JobRun(name=RETENTION_JOB_NAME))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+
+        due_before = now - timedelta(hours=min_interval_hours)
+        claimed = db.query(JobRun)\
+            .filter(
+                JobRun.name == RETENTION_JOB_NAME,
+                or_(JobRun.last_run_at.is_(None), JobRun.last_run_at <= due_before)
+            )\
+            .update({JobRun.last_run_at: now}, synchronize_session=False)
+        db.commit()
+        return bool(claimed)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def run_retention(min_interval_hours: float = 0) -> dict:
+    """
+    Apply every retention policy once.
+    Returns {} without doing anything when another worker holds the job
+    or it already ran within `min_interval_hours`.
+    """
+    with _try_retention_lock() as acquired:
+        if not acquired or not _claim_run(min_interval_hours):
+            return {}
+        return {
+            "portfolio_history": prune_portfolio_history(),
+            "feedback": expire_unapproved_feedback(),
+            "expired_tokens": purge_expired_tokens(),
+        }
+
+def start_retention_scheduler() -> Optional[threading.Thread]:
+    """
+    Run the retention job every RETENTION_INTERVAL_HOURS in a daemon thread.
+    Every worker checks periodically; the last run time in job_runs keeps
+    restarts and worker recycling from re-running it early.
+    """
+    if RETENTION_INTERVAL_HOURS <= 0:
+        return None
+    check_seconds = min(RETENTION_INTERVAL_HOURS * 3600, RETENTION_CHECK_SECONDS)
+
+    def loop():
+        time.sleep(random.uniform(0, RETENTION_STARTUP_JITTER_SECONDS))
+        while True:
+            try:
+                result = run_retention(RETENTION_INTERVAL_HOURS)
+                if result:
+                    print(f"🧹 Retention: {result}")
+            except Exception as e:
+                print(f"Retention job failed: {e}")
+            time.sleep(check_seconds)
+
+    thread = threading.Thread(target=loop, name="retention", daemon=True)
+    thread.start()
+    return thread
+
+if __name__ == "__main__":
+    print(run_retention())
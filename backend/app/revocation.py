@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+import os
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from .config import load_env
+from .database import SessionLocal
+from .models import RevokedToken
+
+load_env()
+
+# ======================================================
+# Configuration (env-driven)
+# ======================================================
+
+# "memory" keeps revocations local to the process,
+# "database" shares them across workers through revoked_tokens.
+TOKEN_DENYLIST_BACKEND = os.getenv("TOKEN_DENYLIST_BACKEND", "database")
+TOKEN_DENYLIST_SYNC_SECONDS = float(
+    os.getenv("TOKEN_DENYLIST_SYNC_SECONDS", "5")
+)
+# Each sync re-reads revocations this far behind the newest one seen, so a
+# row whose transaction committed late is still picked up
+TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS = float(
+    os.getenv("TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS", "60")
+)
+
+# ======================================================
+# Backends
+# ======================================================
+
+class MemoryDenylistBackend:
+    """Process-local backend (single worker, tests, benchmarks)"""
+
+    shared = False
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        pass
+
+    def fetch(self, cursor: Optional[datetime]) -> Tuple[Iterable[Tuple[str, float]], Optional[datetime]]:
+        return (), cursor
+
+class DatabaseDenylistBackend:
+    """
+    Shares revocations between workers through the revoked_tokens table.
+    Rows are pulled incrementally by revoked_at with an overlap window
+    rather than by id: sequence values are handed out before commit, so
+    ids do not arrive in order. Expired rows are deleted by the retention
+    job (retention.purge_expired_tokens).
+    """
+
+    shared = True
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        db = SessionLocal()
+        try:
+            db.add(RevokedToken(
+                jti=jti,
+                expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            ))
+            db.commit()
+        except IntegrityError:
+            # Revoked concurrently (e.g. a double logout): already done
+            db.rollback()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def fetch(self, cursor: Optional[datetime]) -> Tuple[Iterable[Tuple[str, float]], Optional[datetime]]:
+        db = SessionLocal()
+        try:
+            query = (
+                db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+                .filter(RevokedToken.expires_at > datetime.now(timezone.utc))
+            )
+            if cursor is not None:
+                query = query.filter(
+                    RevokedToken.revoked_at
+                    >= cursor - timedelta(seconds=TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS)
+                )
+            rows = query.all()
+        finally:
+            db.close()
+
+        entries = []
+        for jti, expires_at, revoked_at in rows:
+            entries.append((jti, _as_utc(expires_at).timestamp()))
+            if revoked_at is not None:
+                revoked_at = _as_utc(revoked_at)
+                if cursor is None or revoked_at > cursor:
+                    cursor = revoked_at
+        return entries, cursor
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+BACKENDS = {
+    "memory": MemoryDenylistBackend,
+    "database": DatabaseDenylistBackend,
+}
+
+# ======================================================
+# Denylist
+# ======================================================
+
+class TokenDenylist:
+    """
+    In-memory set of revoked token ids (jti -> expiry timestamp).
+
+    The request path is a dict lookup; a background thread pulls from
+    the backend every `sync_seconds`, and entries drop out once the token
+    they refer to would have expired anyway.
+    """
+
+    def __init__(self, backend, sync_seconds: float = TOKEN_DENYLIST_SYNC_SECONDS):
+        self.backend = backend
+        self.sync_seconds = sync_seconds
+        self._entries: Dict[str, float] = {}
+        self._cursor: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke a token id until its expiry (epoch seconds)"""
+        self._entries[jti] = expires_at
+        self.backend.publish(jti, expires_at)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Check whether a token id has been revoked (no I/O)"""
+        return jti in self._entries
+
+    def start(self) -> None:
+        """Load revocations now, then keep syncing in a daemon thread"""
+        if not self.backend.shared or self._thread is not None:
+            return
+        self.sync()
+
+        def loop():
+            while True:
+                time.sleep(self.sync_seconds)
+                self.sync()
+
+        self._thread = threading.Thread(
+            target=loop, name="token-denylist-sync", daemon=True
+        )
+        self._thread.start()
+
+    def sync(self) -> None:
+        """Pull revocations published by other workers and drop expired ones"""
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            entries, self._cursor = self.backend.fetch(self._cursor)
+            now = time.time()
+            for jti, expires_at in entries:
+                if expires_at > now:
+                    self._entries[jti] = expires_at
+            expired = [jti for jti, exp in list(self._entries.items()) if exp <= now]
+            for jti in expired:
+                self._entries.pop(jti, None)
+        except Exception as e:
+            print(f"Token denylist sync failed: {e}")
+        finally:
+            self._lock.release()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._cursor = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def _create_denylist() -> TokenDenylist:
+    backend_cls = BACKENDS.get(TOKEN_DENYLIST_BACKEND)
+    if backend_cls is None:
+        raise RuntimeError(
+            f"Unknown TOKEN_DENYLIST_BACKEND '{TOKEN_DENYLIST_BACKEND}'"
+        )
+    return TokenDenylist(backend_cls())
+
+token_denylist = _create_denylist()
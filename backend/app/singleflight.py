@@ -0,0 +1,49 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+import threading
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+
+    The first caller runs `fn`; callers arriving while it is in flight
+    block until it finishes and receive the same result (or exception).
+    Nothing is cached once the call completes. Handlers run in FastAPI's
+    threadpool, so waiting on a thread future is fine here.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return (result, shared) where shared is True for waiters"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+
+# Shared by the public read routes
+read_flight = SingleFlight()
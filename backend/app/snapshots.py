@@ -0,0 +1,233 @@
+"""
+Static JSON snapshots of the public API, for CDN / static hosting.
+
+    python -m app.snapshots        # rebuild every snapshot
+
+When SNAPSHOT_DIR is set, portfolio updates and feedback moderation
+republish the affected files. Each snapshot is written as:
+
+    portfolio-<lang>.json            latest (short cache)
+    portfolio-<lang>.<hash>.json     immutable, content-addressed
+    feedback-approved.json / feedback-approved.<hash>.json
+    manifest.json                    points to the current versioned files
+
+with a precompressed .gz next to every .json. Files are written to a
+temporary name and renamed, so readers never see a partial file.
+Publishing holds an exclusive flock on <dir>/.lock, so workers and the
+CLI never interleave manifest updates or prune each other's files.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from .config import load_env
+from .database import SessionLocal
+from .models import Portfolio, Feedback
+from .schemas import PortfolioResponse, FeedbackResponse
+
+load_env()
+
+# ======================================================
+# Configuration (env-driven)
+# ======================================================
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_KEEP_VERSIONS = int(os.getenv("SNAPSHOT_KEEP_VERSIONS", "5"))
+
+# Languages end up in file names; anything else is skipped
+_LANGUAGE_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+_publish_lock = threading.Lock()
+LOCK_FILENAME = ".lock"
+
+# ======================================================
+# Payloads (shared with the API routes)
+# ======================================================
+
+def portfolio_payload(portfolio: Portfolio) -> dict:
+    """Build the GET /portfolio response body for a portfolio row"""
+    data_content = portfolio.get_data()
+
+    # Older records may lack 'email'; make sure it exists before validation
+    if "email" not in data_content.get("contact", {}):
+        data_content["contact"]["email"] = "your@email.com"
+
+    return {
+        "id": portfolio.id,
+        "name": portfolio.name,
+        "data": data_content,
+        "updated_at": portfolio.updated_at
+    }
+
+def approved_feedback_payload(db: Session) -> List[dict]:
+    """Build the GET /feedback/approved response body"""
+    feedback_list = db.query(Feedback)\
+        .filter(Feedback.is_approved == True)\
+        .order_by(Feedback.created_at.desc())\
+        .all()
+    return [
+        jsonable_encoder(FeedbackResponse.model_validate(f))
+        for f in feedback_list
+    ]
+
+# ======================================================
+# Writing
+# ======================================================
+
+def _atomic_write(path: str, content: bytes) -> None:
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _write_json(path: str, content: bytes) -> None:
+    _atomic_write(path, content)
+    _atomic_write(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+
+def _write_snapshot(directory: str, name: str, body) -> str:
+    """Write latest + versioned copies of `body`; return the versioned filename"""
+    content = json.dumps(
+        jsonable_encoder(body), separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+    version = hashlib.sha256(content).hexdigest()[:12]
+    versioned = f"{name}.{version}.json"
+
+    if not os.path.exists(os.path.join(directory, versioned)):
+        _write_json(os.path.join(directory, versioned), content)
+    _write_json(os.path.join(directory, f"{name}.json"), content)
+    _prune_versions(directory, name, keep=versioned)
+    return versioned
+
+def _prune_versions(directory: str, name: str, keep: str) -> None:
+    if SNAPSHOT_KEEP_VERSIONS <= 0:
+        return
+    versions = sorted(
+        glob.glob(os.path.join(directory, f"{name}.*.json")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for path in versions[SNAPSHOT_KEEP_VERSIONS:]:
+        if os.path.basename(path) == keep:
+            continue
+        for stale in (path, path + ".gz"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+def _update_manifest(directory: str, portfolios: dict, feedback: Optional[str]) -> None:
+    path = os.path.join(directory, "manifest.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    manifest.setdefault("portfolio", {}).update(portfolios)
+    if feedback is not None:
+        manifest["feedback_approved"] = feedback
+    manifest["generated_at"] = datetime.now(timezone.utc).isoformat()
+
+    _write_json(path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+# ======================================================
+# Publishing
+# ======================================================
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Exclusive lock on the snapshot directory, across threads and processes"""
+    with _publish_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(directory, LOCK_FILENAME), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def publish_snapshots(
+    languages: Optional[List[str]] = None,
+    feedback: bool = True,
+    directory: Optional[str] = None
+) -> dict:
+    """
+    Regenerate snapshots for `languages` (all when None) and, optionally,
+    the approved feedback list. No-op when no snapshot directory is set.
+    """
+    directory = directory or SNAPSHOT_DIR
+    if not directory:
+        return {}
+
+    os.makedirs(directory, exist_ok=True)
+    # Read inside the lock so the last publisher also wrote the newest data
+    with _directory_lock(directory):
+        db = SessionLocal()
+        try:
+            query = db.query(Portfolio)
+            if languages is not None:
+                query = query.filter(Portfolio.language.in_(languages))
+
+            portfolios = {
+                p.language: _write_snapshot(
+                    directory,
+                    f"portfolio-{p.language}",
+                    PortfolioResponse.model_validate(portfolio_payload(p))
+                )
+                for p in query.all()
+                if _LANGUAGE_RE.match(p.language)
+            }
+            feedback_file = None
+            if feedback:
+                feedback_file = _write_snapshot(
+                    directory, "feedback-approved", approved_feedback_payload(db)
+                )
+            _update_manifest(directory, portfolios, feedback_file)
+        finally:
+            db.close()
+
+    return {"portfolio": portfolios, "feedback_approved": feedback_file}
+
+def publish_in_background(
+    languages: Optional[List[str]] = None,
+    feedback: bool = True
+) -> None:
+    """BackgroundTasks-friendly wrapper that logs instead of raising"""
+    try:
+        publish_snapshots(languages=languages, feedback=feedback)
+    except Exception as e:
+        print(f"Snapshot publish failed: {e}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else SNAPSHOT_DIR
+    if not target:
+        raise SystemExit("usage: python -m app.snapshots <directory> (or set SNAPSHOT_DIR)")
+    print(json.dumps(publish_snapshots(directory=target), indent=2))
@@ -0,0 +1,110 @@
+"""
+Helpers for hermetic tests and benchmarks on the embedded database.
+
+    python -m pytest               # tests/conftest.py uses these helpers
+    APP_ENV=test python -m app.bench_api
+
+With APP_ENV=test the app runs on in-memory SQLite (see config.py).
+Build the schema and seed data once, take a snapshot, and restore it
+between test cases instead of re-creating everything:
+
+    db_snapshot = seed_database()
+    ...
+    db_snapshot.restore()    # before each test case
+"""
+import json
+import sqlite3
+
+from .database import SessionLocal, engine
+from .init_admin import init_admin
+from .models import Portfolio, Feedback
+from .idempotency import idempotency_store
+from .revocation import token_denylist
+
+SEED_LANGUAGES = ("en", "fr")
+
+SEED_PORTFOLIO_DATA = {
+    "name": "Test User",
+    "hero": {"headline": "Hello", "subheadline": "Seeded for tests"},
+    "about": {"title": "About", "content": "About content"},
+    "skills": {
+        "title": "Skills",
+        "categories": [{"name": "Backend", "items": "Python, FastAPI"}]
+    },
+    "projects": {
+        "title": "Projects",
+        "items": [{
+            "name": "Project",
+            "description": "Description",
+            "projectUrl": "#",
+            "githubUrl": "#"
+        }]
+    },
+    "contact": {
+        "title": "Contact",
+        "message": "Get in touch",
+        "email": "owner@example.com",
+        "links": [{"name": "Email", "url": "mailto:owner@example.com"}]
+    },
+    "footer": {"year": "2026", "name": "Test User"}
+}
+
+def reset_caches() -> None:
+    """Clear in-process state that would leak between test cases"""
+    token_denylist.clear()
+    idempotency_store.clear()
+
+class DatabaseSnapshot:
+    """
+    Copy of an SQLite database taken with the sqlite3 backup API.
+    Restoring copies pages back into the live connection, which is much
+    cheaper than dropping, re-creating and re-seeding the schema.
+    """
+
+    def __init__(self):
+        if engine.dialect.name != "sqlite":
+            raise RuntimeError("Database snapshots require an SQLite engine")
+        self._copy = sqlite3.connect(":memory:", check_same_thread=False)
+        self.take()
+
+    def _live(self):
+        return engine.raw_connection()
+
+    def take(self) -> None:
+        live = self._live()
+        try:
+            live.driver_connection.backup(self._copy)
+        finally:
+            live.close()
+
+    def restore(self) -> None:
+        live = self._live()
+        try:
+            self._copy.backup(live.driver_connection)
+        finally:
+            live.close()
+        reset_caches()
+
+def seed_database() -> DatabaseSnapshot:
+    """Create tables, the admin user and seed data; return a snapshot"""
+    init_admin()
+
+    db = SessionLocal()
+    try:
+        for language in SEED_LANGUAGES:
+            if not db.query(Portfolio).filter(Portfolio.language == language).first():
+                db.add(Portfolio(
+                    name="default",
+                    language=language,
+                    data=json.dumps(SEED_PORTFOLIO_DATA)
+                ))
+        if not db.query(Feedback).first():
+            db.add_all([
+                Feedback(name="Approved", message="Great work", rating=5, is_approved=True),
+                Feedback(name="Pending", message="Awaiting review", rating=4, is_approved=False),
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+    return DatabaseSnapshot()
@@ -0,0 +1,48 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+uvicorn-worker picks uvloop and httptools automatically (both come with
+uvicorn[standard]). All settings are env-driven.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# Each worker has its own SQLAlchemy pool (up to 15 connections), so the
+# default stays small; set WEB_CONCURRENCY to go beyond it.
+workers = int(os.getenv(
+    "WEB_CONCURRENCY", min(2 * multiprocessing.cpu_count() + 1, 4)
+))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# SIGTERM: stop accepting, let in-flight requests finish for graceful_timeout
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "200"))
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Create tables and the admin user once, in the master, before forking"""
+    from app.database import engine
+    from app.init_admin import init_admin
+
+    init_admin()
+    engine.dispose()
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master (only exist with preload)"""
+    from app.database import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,86 @@
+"""Make portfolios.language unique
+
+Tables created before language was declared unique only have a plain
+index, and create_all never alters existing tables. Drop duplicate
+languages (keeping the most recently updated row and moving the history
+of the others onto it), then replace the plain index with a unique one.
+
+On a fresh database this runs before create_all and does nothing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_portfolios_language"
+
+
+def _language_index(inspector):
+    for index in inspector.get_indexes("portfolios"):
+        if index["name"] == INDEX_NAME:
+            return index
+    return None
+
+
+def _remove_duplicate_languages(bind):
+    rows = bind.execute(sa.text(
+        "SELECT id, language, COALESCE(updated_at, created_at) AS changed_at "
+        "FROM portfolios"
+    )).all()
+
+    by_language = defaultdict(list)
+    for row in rows:
+        by_language[row.language].append(row)
+
+    for language, portfolios in by_language.items():
+        if len(portfolios) < 2:
+            continue
+        # Newest change wins; rows never updated sort first, then by id
+        portfolios.sort(key=lambda r: (r.changed_at is not None, r.changed_at or "", r.id))
+        keep = portfolios[-1].id
+        drop = [r.id for r in portfolios[:-1]]
+        print(f"Removing duplicate '{language}' portfolios {drop}, keeping {keep}")
+
+        bind.execute(
+            sa.text(
+                "UPDATE portfolio_history SET portfolio_id = :keep "
+                "WHERE portfolio_id IN :drop"
+            ).bindparams(sa.bindparam("drop", expanding=True)),
+            {"keep": keep, "drop": drop},
+        )
+        bind.execute(
+            sa.text("DELETE FROM portfolios WHERE id IN :drop")
+            .bindparams(sa.bindparam("drop", expanding=True)),
+            {"drop": drop},
+        )
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("portfolios"):
+        return
+
+    index = _language_index(inspector)
+    if index is not None and index["unique"]:
+        return
+
+    _remove_duplicate_languages(bind)
+    if index is not None:
+        op.drop_index(INDEX_NAME, table_name="portfolios")
+    op.create_index(INDEX_NAME, "portfolios", ["language"], unique=True)
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name="portfolios")
+    op.create_index(INDEX_NAME, "portfolios", ["language"], unique=False)
@@ -0,0 +1,51 @@
+import os
+
+# Hermetic: always the embedded database, never a configured one
+os.environ["APP_ENV"] = "test"
+os.environ["DATABASE_URL"] = "sqlite://"
+for name in ("DATABASE_READ_URLS", "SNAPSHOT_DIR", "RESEND_API_KEY"):
+    os.environ.pop(name, None)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.testing import seed_database
+
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME, login
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def db_snapshot(client):
+    """Schema and seed data, built once per session"""
+    return seed_database()
+
+
+@pytest.fixture(autouse=True)
+def _restore_database(db_snapshot, client):
+    db_snapshot.restore()
+    client.cookies.clear()
+    yield
+
+
+@pytest.fixture
+def admin_headers(client):
+    token = login(client, ADMIN_USERNAME, ADMIN_PASSWORD).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def user_headers(client):
+    client.post("/auth/register", json={
+        "username": "visitor",
+        "email": "visitor@example.com",
+        "password": "visitor-password",
+    })
+    token = login(client, "visitor", "visitor-password").json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
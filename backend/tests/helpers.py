@@ -0,0 +1,15 @@
+"""Shared test helpers (fixtures live in conftest.py)"""
+import os
+
+from app.config import load_env
+
+load_env()
+
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.environ["ADMIN_PASSWORD"]
+
+
+def login(client, username: str, password: str):
+    return client.post(
+        "/auth/login", data={"username": username, "password": password}
+    )
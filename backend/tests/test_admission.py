@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app import admission
+from app.admission import AdmissionControlMiddleware, RouteClassLimiter, classify
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _held_app(release: asyncio.Event):
+    """ASGI app whose requests stay in flight until `release` is set"""
+    async def app(scope, receive, send):
+        await release.wait()
+        await _ok_app(scope, receive, send)
+    return app
+
+
+async def _call(middleware, method: str = "GET", path: str = "/portfolio"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    await middleware(scope, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+@pytest.fixture
+def limit_public_reads(monkeypatch):
+    def limit(concurrency: int, queue: int) -> RouteClassLimiter:
+        limiter = RouteClassLimiter("public_read", concurrency, queue)
+        monkeypatch.setitem(admission.limiters, "public_read", limiter)
+        return limiter
+    return limit
+
+
+def test_full_queue_sheds_with_503_and_retry_after(limit_public_reads):
+    limiter = limit_public_reads(concurrency=2, queue=3)
+
+    async def scenario():
+        release = asyncio.Event()
+        middleware = AdmissionControlMiddleware(_held_app(release), timeout=5)
+        tasks = [asyncio.create_task(_call(middleware)) for _ in range(10)]
+        await asyncio.sleep(0.05)
+        shed_early = sum(task.done() for task in tasks)
+        release.set()
+        return shed_early, await asyncio.gather(*tasks)
+
+    shed_early, results = asyncio.run(scenario())
+
+    statuses = [status for status, _ in results]
+    assert shed_early == 5
+    assert statuses.count(200) == 5
+    assert statuses.count(503) == 5
+    assert all(
+        headers[b"retry-after"] == b"1"
+        for status, headers in results if status == 503
+    )
+    assert (limiter.admitted, limiter.shed, limiter.timed_out) == (5, 5, 0)
+    assert (limiter.active, limiter.queued, limiter.max_queued) == (0, 0, 3)
+
+
+def test_queued_request_is_shed_after_timeout(limit_public_reads):
+    limiter = limit_public_reads(concurrency=1, queue=1)
+
+    async def scenario():
+        release = asyncio.Event()
+        middleware = AdmissionControlMiddleware(_held_app(release), timeout=0.05)
+        holder = asyncio.create_task(_call(middleware))
+        await asyncio.sleep(0)
+        waiter = await _call(middleware)
+        release.set()
+        return await holder, waiter
+
+    (held_status, _), (waiter_status, _) = asyncio.run(scenario())
+
+    assert held_status == 200
+    assert waiter_status == 503
+    assert (limiter.admitted, limiter.shed, limiter.timed_out) == (1, 1, 1)
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/health"),
+    ("GET", "/health/admission"),
+    ("GET", "/"),
+    ("OPTIONS", "/portfolio"),
+    ("OPTIONS", "/feedback"),
+])
+def test_probes_and_preflight_bypass_limits(limit_public_reads, method, path):
+    # No slots and no queue: anything classified would be shed
+    limit_public_reads(concurrency=0, queue=0)
+    middleware = AdmissionControlMiddleware(_ok_app)
+
+    status, _ = asyncio.run(_call(middleware, method, path))
+
+    assert status == 200
+    assert classify(method, path) is None
+
+
+@pytest.mark.parametrize("method, path, route_class", [
+    ("POST", "/auth/login", "auth"),
+    ("POST", "/auth/refresh", "auth"),
+    ("GET", "/auth/me", "auth"),
+    ("GET", "/portfolio/history", "admin"),
+    ("GET", "/feedback/pending", "admin"),
+    ("GET", "/feedback/all", "admin"),
+    ("PUT", "/portfolio", "admin"),
+    ("PATCH", "/feedback/3/approve", "admin"),
+    ("DELETE", "/feedback/3", "admin"),
+    ("POST", "/feedback", "public_write"),
+    ("POST", "/contact/send-email", "public_write"),
+    ("GET", "/portfolio", "public_read"),
+    ("GET", "/feedback/approved", "public_read"),
+])
+def test_classify(method, path, route_class):
+    assert classify(method, path) == route_class
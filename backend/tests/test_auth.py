@@ -0,0 +1,136 @@
+from .helpers import ADMIN_PASSWORD, ADMIN_USERNAME, login
+
+
+def test_register_creates_non_admin_user(client):
+    response = client.post("/auth/register", json={
+        "username": "newuser",
+        "email": "newuser@example.com",
+        "password": "secret-password",
+    })
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["username"] == "newuser"
+    assert body["is_admin"] is False
+    assert "hashed_password" not in body
+
+
+def test_register_rejects_duplicate_username(client):
+    response = client.post("/auth/register", json={
+        "username": ADMIN_USERNAME,
+        "email": "other@example.com",
+        "password": "x",
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already registered"
+
+
+def test_register_rejects_duplicate_email(client):
+    client.post("/auth/register", json={
+        "username": "first", "email": "dup@example.com", "password": "x",
+    })
+    response = client.post("/auth/register", json={
+        "username": "second", "email": "dup@example.com", "password": "x",
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_login_returns_token_and_sets_cookies(client):
+    response = login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert response.json()["access_token"]
+    assert "access_token" in response.cookies
+    assert "refresh_token" in response.cookies
+
+
+def test_login_rejects_wrong_password(client):
+    response = login(client, ADMIN_USERNAME, "wrong")
+
+    assert response.status_code == 401
+
+
+def test_me_requires_token(client):
+    assert client.get("/auth/me").status_code == 401
+
+
+def test_me_returns_current_user(client, admin_headers):
+    response = client.get("/auth/me", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json()["username"] == ADMIN_USERNAME
+    assert response.json()["is_admin"] is True
+
+
+def test_refresh_rotates_token(client):
+    login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+    first = client.cookies.get("refresh_token")
+
+    response = client.post("/auth/refresh")
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+    assert client.cookies.get("refresh_token") != first
+    me = client.get(
+        "/auth/me",
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"}
+    )
+    assert me.status_code == 200
+
+
+def test_refresh_reuse_revokes_session(client):
+    login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+    stolen = client.cookies.get("refresh_token")
+    assert client.post("/auth/refresh").status_code == 200
+
+    # The rotated-away token is presented again: the whole family is revoked
+    reuse = client.post("/auth/refresh", json={"refresh_token": stolen})
+    assert reuse.status_code == 401
+    assert client.post("/auth/refresh").status_code == 401
+
+
+def test_refresh_without_token_is_rejected(client):
+    assert client.post("/auth/refresh").status_code == 401
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, admin_headers):
+    login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+
+    response = client.post("/auth/logout", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert client.get("/auth/me", headers=admin_headers).status_code == 401
+    assert client.post("/auth/refresh").status_code == 401
+
+
+def test_logout_without_token_still_succeeds(client):
+    assert client.post("/auth/logout").status_code == 200
+
+
+def test_refresh_token_is_cookie_only_by_default(client):
+    response = login(client, ADMIN_USERNAME, ADMIN_PASSWORD)
+
+    assert response.json()["refresh_token"] is None
+    assert response.cookies.get("refresh_token")
+
+
+def test_non_browser_client_can_opt_into_body_refresh_token(client):
+    response = client.post(
+        "/auth/login",
+        params={"include_refresh_token": True},
+        data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+    )
+    client.cookies.clear()
+
+    refreshed = client.post(
+        "/auth/refresh",
+        params={"include_refresh_token": True},
+        json={"refresh_token": response.json()["refresh_token"]},
+    )
+
+    assert refreshed.status_code == 200
+    assert refreshed.json()["refresh_token"]
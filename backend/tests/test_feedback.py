@@ -0,0 +1,85 @@
+from app.database import SessionLocal
+from app.models import Feedback
+
+
+def _feedback_id(name: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Feedback).filter(Feedback.name == name).one().id
+    finally:
+        db.close()
+
+
+def test_create_feedback_is_pending(client):
+    response = client.post(
+        "/feedback", json={"name": "Alice", "message": "Nice", "rating": 5}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["is_approved"] is False
+    assert "Alice" not in [f["name"] for f in client.get("/feedback/approved").json()]
+
+
+def test_create_feedback_validates_rating(client):
+    response = client.post(
+        "/feedback", json={"name": "Bob", "message": "Hi", "rating": 6}
+    )
+
+    assert response.status_code == 422
+
+
+def test_approved_feedback_lists_only_approved(client):
+    names = [f["name"] for f in client.get("/feedback/approved").json()]
+
+    assert names == ["Approved"]
+
+
+def test_admin_lists_require_admin(client, user_headers):
+    for path in ("/feedback/pending", "/feedback/all"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers=user_headers).status_code == 403
+
+
+def test_pending_and_all_feedback(client, admin_headers):
+    pending = client.get("/feedback/pending", headers=admin_headers).json()
+    everything = client.get("/feedback/all", headers=admin_headers).json()
+
+    assert [f["name"] for f in pending] == ["Pending"]
+    assert sorted(f["name"] for f in everything) == ["Approved", "Pending"]
+
+
+def test_approve_and_reject_feedback(client, admin_headers):
+    feedback_id = _feedback_id("Pending")
+
+    approved = client.patch(
+        f"/feedback/{feedback_id}/approve", json={"approve": True},
+        headers=admin_headers
+    )
+    assert approved.status_code == 200
+    assert approved.json()["is_approved"] is True
+    assert approved.json()["approved_at"] is not None
+    assert "Pending" in [f["name"] for f in client.get("/feedback/approved").json()]
+
+    rejected = client.patch(
+        f"/feedback/{feedback_id}/approve", json={"approve": False},
+        headers=admin_headers
+    )
+    assert rejected.json()["is_approved"] is False
+    assert rejected.json()["approved_at"] is None
+
+
+def test_approve_unknown_feedback_is_404(client, admin_headers):
+    response = client.patch(
+        "/feedback/9999/approve", json={"approve": True}, headers=admin_headers
+    )
+
+    assert response.status_code == 404
+
+
+def test_delete_feedback(client, admin_headers, user_headers):
+    feedback_id = _feedback_id("Approved")
+
+    assert client.delete(f"/feedback/{feedback_id}", headers=user_headers).status_code == 403
+    assert client.delete(f"/feedback/{feedback_id}", headers=admin_headers).status_code == 200
+    assert client.get("/feedback/approved").json() == []
+    assert client.delete(f"/feedback/{feedback_id}", headers=admin_headers).status_code == 404
@@ -0,0 +1,42 @@
+CONTACT = {
+    "name": "Visitor",
+    "email": "visitor@example.com",
+    "subject": "Hello",
+    "message": "Let's talk",
+}
+
+
+def test_root(client):
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+def test_health(client):
+    assert client.get("/health").json() == {
+        "status": "healthy", "database": "connected"
+    }
+
+
+def test_admission_metrics(client):
+    client.get("/portfolio")
+
+    stats = client.get("/health/admission").json()
+
+    assert set(stats) == {"public_read", "public_write", "auth", "admin"}
+    assert stats["public_read"]["admitted"] >= 1
+    assert stats["public_read"]["active"] == 0
+
+
+def test_contact_logs_when_resend_is_not_configured(client):
+    response = client.post("/contact/send-email", json=CONTACT)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "logged"
+
+
+def test_contact_validates_email(client):
+    response = client.post("/contact/send-email", json=dict(CONTACT, email="nope"))
+
+    assert response.status_code == 422
@@ -0,0 +1,168 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import main
+from app.database import SessionLocal
+from app.idempotency import IdempotencyStore, _request_hash
+from app.models import Feedback, IdempotencyKey
+
+
+def _count(model) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(model).count()
+    finally:
+        db.close()
+
+
+def _insert_claim(key: str, request_hash: str, claimed_at: datetime) -> None:
+    db = SessionLocal()
+    try:
+        db.add(IdempotencyKey(
+            scope="test",
+            key=key,
+            request_hash=request_hash,
+            created_at=claimed_at,
+            expires_at=claimed_at + timedelta(hours=1),
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_retry_with_same_key_is_replayed(client):
+    feedback = {"name": "Retry", "message": "Once"}
+    headers = {"Idempotency-Key": "retry-1"}
+    before = _count(Feedback)
+
+    first = client.post("/feedback", json=feedback, headers=headers)
+    second = client.post("/feedback", json=feedback, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert _count(Feedback) == before + 1
+
+
+def test_same_key_with_different_payload_is_rejected(client):
+    headers = {"Idempotency-Key": "retry-2"}
+    client.post("/feedback", json={"name": "A", "message": "One"}, headers=headers)
+
+    response = client.post(
+        "/feedback", json={"name": "A", "message": "Two"}, headers=headers
+    )
+
+    assert response.status_code == 422
+
+
+def test_concurrent_duplicates_run_handler_once(client):
+    store = IdempotencyStore(max_entries=16, ttl_seconds=3600)
+    calls = []
+    lock = threading.Lock()
+
+    def handler():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {"ok": True}
+
+    def send(_):
+        return store.run("test", "concurrent", {"n": 1}, 201, handler)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(send, range(8)))
+
+    assert len(calls) == 1
+    assert {stored.body["ok"] for stored, _ in results} == {True}
+    assert sum(not replayed for _, replayed in results) == 1
+    assert _count(IdempotencyKey) == 1
+
+
+def test_live_claim_from_another_worker_conflicts(client):
+    store = IdempotencyStore(max_entries=16, ttl_seconds=3600, lease_seconds=60)
+    payload = {"n": 1}
+    _insert_claim("busy", _request_hash(payload), datetime.now(timezone.utc))
+
+    with pytest.raises(HTTPException) as excinfo:
+        store.run("test", "busy", payload, 200, lambda: {"ok": True})
+
+    assert excinfo.value.status_code == 409
+
+
+def test_abandoned_claim_is_taken_over_after_lease(client):
+    store = IdempotencyStore(max_entries=16, ttl_seconds=3600, lease_seconds=60)
+    payload = {"n": 1}
+    _insert_claim(
+        "abandoned", _request_hash(payload),
+        datetime.now(timezone.utc) - timedelta(minutes=5)
+    )
+
+    stored, replayed = store.run(
+        "test", "abandoned", payload, 200, lambda: {"ok": True}
+    )
+
+    assert stored.body == {"ok": True}
+    assert replayed is False
+    db = SessionLocal()
+    try:
+        row = db.query(IdempotencyKey).filter(IdempotencyKey.key == "abandoned").one()
+        assert row.response_body is not None
+    finally:
+        db.close()
+
+
+def test_response_is_replayed_when_storing_it_fails(client, monkeypatch):
+    store = IdempotencyStore(max_entries=16, ttl_seconds=3600)
+    calls = []
+
+    def fail(cache_key, stored):
+        raise RuntimeError("database went away")
+
+    def handler():
+        calls.append(1)
+        return {"sent": True}
+
+    monkeypatch.setattr(store, "_complete", fail)
+
+    first, first_replayed = store.run("test", "unsaved", {"n": 1}, 200, handler)
+    second, second_replayed = store.run("test", "unsaved", {"n": 1}, 200, handler)
+
+    assert first.body == second.body == {"sent": True}
+    assert (first_replayed, second_replayed) == (False, True)
+    assert len(calls) == 1
+
+
+def test_contact_email_is_sent_once_per_key(client, monkeypatch):
+    sent = []
+    send = main._send_contact_email
+
+    def counting_send(contact_request, db):
+        sent.append(contact_request.email)
+        return send(contact_request, db)
+
+    monkeypatch.setattr(main, "_send_contact_email", counting_send)
+    contact = {
+        "name": "Visitor",
+        "email": "visitor@example.com",
+        "subject": "Hello",
+        "message": "Let's talk",
+    }
+    headers = {"Idempotency-Key": "contact-1"}
+
+    first = client.post("/contact/send-email", json=contact, headers=headers)
+    second = client.post("/contact/send-email", json=contact, headers=headers)
+    changed = client.post(
+        "/contact/send-email", json=dict(contact, message="Other"), headers=headers
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert changed.status_code == 422
+    assert sent == ["visitor@example.com"]
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def legacy_database(tmp_path):
+    """A file database shaped like one created before language was unique"""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    legacy = create_engine(url)
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE portfolios (id INTEGER PRIMARY KEY, name VARCHAR(100), "
+            "language VARCHAR(10), data TEXT, created_at DATETIME, "
+            "updated_at DATETIME, updated_by INTEGER)"
+        ))
+        conn.execute(text("CREATE INDEX ix_portfolios_language ON portfolios (language)"))
+        conn.execute(text(
+            "CREATE TABLE portfolio_history (id INTEGER PRIMARY KEY, "
+            "portfolio_id INTEGER, data TEXT)"
+        ))
+        conn.execute(text(
+            "INSERT INTO portfolios (id, name, language, data, created_at, updated_at) VALUES "
+            "(1, 'default', 'en', '{}', '2026-01-01', '2026-03-01'), "
+            "(2, 'default', 'en', '{}', '2026-01-02', NULL), "
+            "(3, 'default', 'fr', '{}', '2026-01-01', NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO portfolio_history (id, portfolio_id, data) VALUES (1, 2, '{}')"
+        ))
+    yield url, legacy
+    legacy.dispose()
+
+
+def _upgrade(url: str) -> None:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+
+
+def test_migration_removes_duplicates_and_adds_unique_index(legacy_database):
+    url, legacy = legacy_database
+
+    _upgrade(url)
+
+    with legacy.connect() as conn:
+        rows = conn.execute(text("SELECT id, language FROM portfolios ORDER BY id")).all()
+        history = conn.execute(text("SELECT portfolio_id FROM portfolio_history")).scalars().all()
+    indexes = {i["name"]: i for i in inspect(legacy).get_indexes("portfolios")}
+
+    assert [tuple(r) for r in rows] == [(1, "en"), (3, "fr")]
+    assert history == [1]
+    assert indexes["ix_portfolios_language"]["unique"]
+
+
+def test_migration_is_a_no_op_on_a_fresh_database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'fresh.db'}"
+
+    _upgrade(url)
+
+    assert not inspect(create_engine(url)).has_table("portfolios")
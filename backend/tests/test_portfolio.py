@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models import Portfolio
+from app.testing import SEED_PORTFOLIO_DATA
+
+
+def test_get_portfolio_returns_seeded_data(client):
+    response = client.get("/portfolio", params={"language": "en"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["name"] == SEED_PORTFOLIO_DATA["name"]
+
+
+def test_get_portfolio_creates_default_for_new_language(client):
+    response = client.get("/portfolio", params={"language": "es"})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "default"
+    assert response.json()["data"]["contact"]["email"] == "your@email.com"
+
+
+def test_update_portfolio_requires_admin(client, user_headers):
+    body = {"data": SEED_PORTFOLIO_DATA}
+
+    assert client.put("/portfolio", json=body).status_code == 401
+    assert client.put("/portfolio", json=body, headers=user_headers).status_code == 403
+
+
+def test_update_portfolio_saves_data_and_history(client, admin_headers):
+    data = dict(SEED_PORTFOLIO_DATA, name="Updated Name")
+
+    response = client.put(
+        "/portfolio", json={"data": data}, params={"language": "en"},
+        headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["name"] == "Updated Name"
+    assert client.get("/portfolio").json()["data"]["name"] == "Updated Name"
+
+    history = client.get("/portfolio/history", headers=admin_headers).json()
+    assert len(history) == 1
+    assert history[0]["data"]["name"] == SEED_PORTFOLIO_DATA["name"]
+    assert history[0]["change_description"] == "Portfolio updated (en)"
+
+
+def test_update_portfolio_unknown_language_is_404(client, admin_headers):
+    response = client.put(
+        "/portfolio", json={"data": SEED_PORTFOLIO_DATA},
+        params={"language": "zz"}, headers=admin_headers
+    )
+
+    assert response.status_code == 404
+
+
+def test_history_requires_admin(client, user_headers):
+    assert client.get("/portfolio/history").status_code == 401
+    assert client.get("/portfolio/history", headers=user_headers).status_code == 403
+
+
+def test_history_is_paginated(client, admin_headers):
+    for i in range(3):
+        data = dict(SEED_PORTFOLIO_DATA, name=f"Version {i}")
+        client.put("/portfolio", json={"data": data}, headers=admin_headers)
+
+    first = client.get(
+        "/portfolio/history", params={"skip": 0, "limit": 2},
+        headers=admin_headers
+    ).json()
+    rest = client.get(
+        "/portfolio/history", params={"skip": 2, "limit": 2},
+        headers=admin_headers
+    ).json()
+
+    assert len(first) == 2
+    assert len(rest) == 1
+    assert {h["data"]["name"] for h in first + rest} == {
+        SEED_PORTFOLIO_DATA["name"], "Version 0", "Version 1"
+    }
+
+
+def test_concurrent_first_reads_create_one_default(client):
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO PORTFOLIOS"):
+            inserts.append(statement)
+            # Hold the creating request open so the others pile up behind it
+            time.sleep(0.1)
+
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(
+                lambda _: client.get("/portfolio", params={"language": "xx"}),
+                range(8)
+            ))
+    finally:
+        event.remove(engine, "before_cursor_execute", count_inserts)
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert len(inserts) == 1
+    db = SessionLocal()
+    try:
+        assert db.query(Portfolio).filter(Portfolio.language == "xx").count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app import database
+from app.database import Base, PRIMARY_READS_COOKIE, Replica
+from app.models import Portfolio
+from app.testing import SEED_PORTFOLIO_DATA
+
+
+def _replica(path, name="replica0", schema=True):
+    replica = Replica(name, f"sqlite:///{path}")
+    if schema:
+        Base.metadata.create_all(bind=replica.engine)
+        db = replica.SessionLocal()
+        try:
+            db.add(Portfolio(
+                name="default",
+                language="en",
+                data=json.dumps(dict(SEED_PORTFOLIO_DATA, name="Replica User"))
+            ))
+            db.commit()
+        finally:
+            db.close()
+    return replica
+
+
+def _served_name(client, **kwargs) -> str:
+    response = client.get("/portfolio", params={"language": "en"}, **kwargs)
+    assert response.status_code == 200
+    return response.json()["data"]["name"]
+
+
+@pytest.fixture
+def use_replicas(monkeypatch):
+    created = []
+
+    def use(*replicas):
+        created.extend(replicas)
+        monkeypatch.setattr(database, "replicas", list(replicas))
+        return replicas
+
+    yield use
+    for replica in created:
+        replica.engine.dispose()
+
+
+def test_healthy_replica_serves_public_reads(client, tmp_path, use_replicas):
+    use_replicas(_replica(tmp_path / "replica.db"))
+
+    assert _served_name(client) == "Replica User"
+
+
+def test_authorization_header_reads_from_primary(client, tmp_path, use_replicas, admin_headers):
+    use_replicas(_replica(tmp_path / "replica.db"))
+
+    assert _served_name(client, headers=admin_headers) == SEED_PORTFOLIO_DATA["name"]
+
+
+def test_write_pins_client_to_primary(client, tmp_path, use_replicas, admin_headers):
+    use_replicas(_replica(tmp_path / "replica.db"))
+    data = dict(SEED_PORTFOLIO_DATA, name="Just Written")
+
+    response = client.put(
+        "/portfolio", json={"data": data}, params={"language": "en"},
+        headers=admin_headers
+    )
+
+    assert PRIMARY_READS_COOKIE in response.cookies
+    assert _served_name(client) == "Just Written"
+
+
+def test_dead_replica_falls_back_to_primary(client, tmp_path, use_replicas):
+    (dead,) = use_replicas(Replica("replica0", f"sqlite:///{tmp_path}/missing/x.db"))
+
+    assert _served_name(client) == SEED_PORTFOLIO_DATA["name"]
+    assert not dead.healthy
+
+
+def test_replica_dropping_after_checkout_retries_on_primary(client, tmp_path, use_replicas):
+    (broken,) = use_replicas(_replica(tmp_path / "broken.db", schema=False))
+
+    @event.listens_for(broken.engine, "handle_error")
+    def _as_disconnect(context):
+        # Treat the failing query like a connection lost mid-request
+        context.is_disconnect = True
+
+    assert _served_name(client) == SEED_PORTFOLIO_DATA["name"]
+    assert not broken.healthy
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+
+import pytest
+
+from app import retention
+from app.database import SessionLocal
+from app.models import Feedback, JobRun, PortfolioHistory
+from app.retention import RETENTION_JOB_NAME, run_retention
+
+
+def _set_last_run(last_run_at: datetime) -> None:
+    db = SessionLocal()
+    try:
+        db.merge(JobRun(name=RETENTION_JOB_NAME, last_run_at=last_run_at))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_retention_skips_when_it_ran_within_the_interval():
+    assert run_retention(min_interval_hours=24) != {}
+    # A restarted or recycled worker checks again right away
+    assert run_retention(min_interval_hours=24) == {}
+
+
+def test_retention_runs_once_the_interval_has_passed():
+    _set_last_run(datetime.now(timezone.utc) - timedelta(hours=25))
+
+    assert run_retention(min_interval_hours=24) != {}
+
+
+def test_manual_run_ignores_the_interval():
+    run_retention(min_interval_hours=24)
+
+    assert set(run_retention()) == {"portfolio_history", "feedback", "expired_tokens"}
+
+
+@pytest.fixture
+def small_batches(monkeypatch, tmp_path):
+    """Batches of two, archived under tmp_path; returns the batch sizes seen"""
+    monkeypatch.setattr(retention, "RETENTION_BATCH_SIZE", 2)
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    monkeypatch.setattr(retention, "RETENTION_ARCHIVE_DIR", str(tmp_path))
+
+    batches = []
+    write = retention.NdjsonArchive.write
+
+    def counting_write(self, rows):
+        batches.append(len(rows))
+        write(self, rows)
+
+    monkeypatch.setattr(retention.NdjsonArchive, "write", counting_write)
+    return batches
+
+
+def _archived(directory, table: str) -> list:
+    records = []
+    for path in sorted(directory.glob(f"{table}-*.ndjson.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+def _seed_history(portfolio_id: int, versions: int) -> list:
+    db = SessionLocal()
+    try:
+        rows = [
+            PortfolioHistory(portfolio_id=portfolio_id, data=json.dumps({"v": v}))
+            for v in range(versions)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def _remaining(column) -> list:
+    db = SessionLocal()
+    try:
+        return sorted(value for (value,) in db.query(column))
+    finally:
+        db.close()
+
+
+def test_prune_history_keeps_newest_versions_per_portfolio(small_batches, tmp_path):
+    many = _seed_history(portfolio_id=1, versions=7)
+    few = _seed_history(portfolio_id=2, versions=2)
+
+    deleted = retention.prune_portfolio_history(keep=3)
+
+    assert deleted == 4
+    assert _remaining(PortfolioHistory.id) == sorted(many[4:] + few)
+    assert small_batches == [2, 2]
+    archived = _archived(tmp_path, "portfolio_history")
+    assert [r["id"] for r in archived] == many[:4]
+    assert json.loads(archived[0]["data"]) == {"v": 0}
+
+
+def test_expire_unapproved_feedback_archives_then_deletes(small_batches, tmp_path):
+    old = datetime.now(timezone.utc) - timedelta(days=200)
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Feedback(name="Old approved", message="m", is_approved=True, created_at=old),
+            Feedback(name="Old pending 1", message="m", is_approved=False, created_at=old),
+            Feedback(name="Old pending 2", message="m", is_approved=False, created_at=old),
+            Feedback(name="Old rejected", message="m", is_approved=False, created_at=old),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    deleted = retention.expire_unapproved_feedback(max_age_days=180)
+
+    assert deleted == 3
+    assert _remaining(Feedback.name) == ["Approved", "Old approved", "Pending"]
+    assert small_batches == [2, 1]
+    assert sorted(r["name"] for r in _archived(tmp_path, "feedback")) == [
+        "Old pending 1", "Old pending 2", "Old rejected"
+    ]
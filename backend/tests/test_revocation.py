@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+from app.database import SessionLocal
+from app.models import RevokedToken
+from app.revocation import (
+    DatabaseDenylistBackend, MemoryDenylistBackend, TokenDenylist
+)
+
+
+def _insert_revocation(jti: str, revoked_at: datetime) -> None:
+    db = SessionLocal()
+    try:
+        db.add(RevokedToken(
+            jti=jti,
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+            revoked_at=revoked_at,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_sync_picks_up_revocations_committed_late():
+    denylist = TokenDenylist(DatabaseDenylistBackend())
+    now = datetime.now(timezone.utc)
+
+    _insert_revocation("newer", now)
+    denylist.sync()
+    # Lower timestamp (and on Postgres possibly lower id) than the cursor,
+    # but committed after the previous sync
+    _insert_revocation("committed-late", now - timedelta(seconds=10))
+    denylist.sync()
+
+    assert denylist.is_revoked("newer")
+    assert denylist.is_revoked("committed-late")
+
+
+def test_is_revoked_never_touches_the_backend():
+    class CountingBackend(MemoryDenylistBackend):
+        fetches = 0
+
+        def fetch(self, cursor):
+            CountingBackend.fetches += 1
+            return (), cursor
+
+    denylist = TokenDenylist(CountingBackend(), sync_seconds=0)
+    denylist.revoke("jti", time.time() + 60)
+
+    for _ in range(100):
+        assert denylist.is_revoked("jti")
+    assert not denylist.is_revoked("other")
+    assert CountingBackend.fetches == 0
+
+
+def test_sync_drops_expired_entries():
+    denylist = TokenDenylist(MemoryDenylistBackend())
+    denylist.revoke("expired", time.time() - 1)
+
+    denylist.sync()
+
+    assert not denylist.is_revoked("expired")
+
+
+def test_publishing_the_same_revocation_twice_is_harmless():
+    backend = DatabaseDenylistBackend()
+    expires_at = time.time() + 3600
+
+    backend.publish("double-logout", expires_at)
+    backend.publish("double-logout", expires_at)
+
+    entries, _ = backend.fetch(None)
+    assert [jti for jti, _ in entries] == ["double-logout"]
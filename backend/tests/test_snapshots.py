@@ -0,0 +1,37 @@
+import fcntl
+import json
+import threading
+
+from app.snapshots import LOCK_FILENAME, publish_snapshots
+
+
+def test_publish_writes_snapshots_and_manifest(client, tmp_path):
+    result = publish_snapshots(directory=str(tmp_path))
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert set(manifest["portfolio"]) == {"en", "fr"}
+    assert manifest["feedback_approved"] == result["feedback_approved"]
+    assert (tmp_path / manifest["portfolio"]["en"]).exists()
+    assert (tmp_path / "portfolio-en.json.gz").exists()
+
+
+def test_publish_waits_for_lock_held_by_another_process(client, tmp_path):
+    published = threading.Event()
+
+    def publish():
+        publish_snapshots(directory=str(tmp_path))
+        published.set()
+
+    # flock locks belong to the open file, so a separate handle stands in
+    # for another worker process
+    with open(tmp_path / LOCK_FILENAME, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        thread = threading.Thread(target=publish)
+        thread.start()
+        assert not published.wait(0.3)
+        assert not (tmp_path / "manifest.json").exists()
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    thread.join(timeout=5)
+    assert published.is_set()
+    assert (tmp_path / "manifest.json").exists()